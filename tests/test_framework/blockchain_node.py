@@ -17,7 +17,6 @@ from config.node_config import (
 from utility.simple_rpc_proxy import SimpleRpcProxy
 from utility.utils import (
     initialize_config,
-    wait_until,
     estimate_st_performance
 )
 from test_framework.contracts import load_contract_metadata
@@ -206,7 +205,15 @@ class TestNode:
         return True
 
     def wait_until_stopped(self, close_stdout_stderr=True, timeout=20):
-        wait_until(self.__is_node_stopped__, timeout=timeout)
+        # block on the OS child wait instead of polling poll() twice a second
+        if self.running and self.process is not None:
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._raise_assertion_error(
+                    "Node did not stop within {} seconds".format(timeout)
+                )
+        self.__is_node_stopped__()
         if close_stdout_stderr:
             self.__safe_close_stdout_stderr__()
 
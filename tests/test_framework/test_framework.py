@@ -1,5 +1,8 @@
 import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import functools
 import logging
 import os
 import pdb
@@ -9,6 +12,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import json
@@ -25,6 +29,15 @@ from utility.build_binary import build_zgs, build_kv
 
 __file_path__ = os.path.dirname(os.path.realpath(__file__))
 
+# Binary and contract paths are constant for the lifetime of a test run,
+# so memoize the resolution to avoid repeated stat/getcwd syscalls in
+# per-upload/download helpers.
+__abspath_cached__ = functools.lru_cache(maxsize=None)(os.path.abspath)
+__path_exists_cached__ = functools.lru_cache(maxsize=None)(os.path.exists)
+
+# merkle root as logged by the CLI on upload, e.g. root=0x...
+__upload_root_re__ = re.compile(rb"root=(0x[0-9a-fA-F]{64})")
+
 
 class TestStatus(Enum):
     PASSED = 1
@@ -52,7 +65,6 @@ class TestFramework:
         self.block_time = blockchain_node_type.block_time()
         self.enable_market = True
         self.mine_period = 100
-        self.launch_wait_seconds = 1
 
         self.indexer_process = None
         self.indexer_rpc_url = None
@@ -103,40 +115,44 @@ class TestFramework:
 
             self.blockchain_nodes.append(node)
             node.setup_config()
-            node.start()
 
-        # wait node to start to avoid NewConnectionError
-        time.sleep(1)
-        for node in self.blockchain_nodes:
-            node.wait_for_rpc_connection()
+        # configs are independent, so start all nodes concurrently
+        with ThreadPoolExecutor(max_workers=self.num_blockchain_nodes) as executor:
+            list(executor.map(lambda node: node.start(), self.blockchain_nodes))
+
+        # wait_for_rpc_connection polls until the endpoint is reachable,
+        # so no fixed startup sleep is needed
+        with ThreadPoolExecutor(max_workers=self.num_blockchain_nodes) as executor:
+            list(executor.map(lambda node: node.wait_for_rpc_connection(), self.blockchain_nodes))
 
         if self.blockchain_node_type == BlockChainNodeType.ZG:
-            # wait for the first block
-            self.log.debug("Wait 3 seconds for 0gchain node to generate first block")
-            time.sleep(3)
-            for node in self.blockchain_nodes:
+            # wait for peers to connect and the first block to be generated
+            def wait_for_peers_and_first_block(node):
                 wait_until(lambda: node.net_peerCount() == self.num_blockchain_nodes - 1)
                 wait_until(lambda: node.eth_blockNumber() is not None)
                 wait_until(lambda: int(node.eth_blockNumber(), 16) > 0)
 
+            with ThreadPoolExecutor(max_workers=self.num_blockchain_nodes) as executor:
+                list(executor.map(wait_for_peers_and_first_block, self.blockchain_nodes))
+
         contract, tx_hash, mine_contract, reward_contract = self.blockchain_nodes[0].setup_contract(self.enable_market, self.mine_period)
         self.contract = FlowContractProxy(contract, self.blockchain_nodes)
         self.mine_contract = MineContractProxy(mine_contract, self.blockchain_nodes)
         self.reward_contract = RewardContractProxy(reward_contract, self.blockchain_nodes)
 
 
-        for node in self.blockchain_nodes[1:]:
-            node.wait_for_transaction(tx_hash)
+        if self.num_blockchain_nodes > 1:
+            with ThreadPoolExecutor(max_workers=self.num_blockchain_nodes - 1) as executor:
+                list(executor.map(lambda node: node.wait_for_transaction(tx_hash), self.blockchain_nodes[1:]))
 
     def __setup_zgs_node(self):
-        build_zgs(Path(self.zgs_binary).parent.absolute())
         for i in range(self.num_nodes):
             if i in self.zgs_node_configs:
                 updated_config = self.zgs_node_configs[i]
             else:
                 updated_config = {}
 
-            assert os.path.exists(self.zgs_binary), (
+            assert __path_exists_cached__(self.zgs_binary), (
                 "%s should be exist" % self.zgs_binary
             )
             node = ZgsNode(
@@ -150,16 +166,17 @@ class TestFramework:
             )
             self.nodes.append(node)
             node.setup_config()
-            # wait first node start for connection
-            if i > 0:
-                time.sleep(1)
-            node.start()
 
-        self.log.info("Wait the zgs_node launch for %d seconds", self.launch_wait_seconds)
-        time.sleep(self.launch_wait_seconds)
-        
-        for node in self.nodes:
-            node.wait_for_rpc_connection()
+        # bring up the first node for the others to connect to, then
+        # start the rest concurrently
+        self.nodes[0].start()
+        self.nodes[0].wait_for_rpc_connection()
+        if self.num_nodes > 1:
+            with ThreadPoolExecutor(max_workers=self.num_nodes - 1) as executor:
+                list(executor.map(lambda node: node.start(), self.nodes[1:]))
+
+        with ThreadPoolExecutor(max_workers=self.num_nodes) as executor:
+            list(executor.map(lambda node: node.wait_for_rpc_connection(), self.nodes))
 
     def add_arguments(self, parser: argparse.ArgumentParser):
 
@@ -254,6 +271,11 @@ class TestFramework:
             else self.options.loglevel.upper()
         )
         ch.setLevel(ll)
+        # The logger itself is pinned at DEBUG so the file handler sees
+        # everything, which means isEnabledFor(DEBUG) can never short-circuit.
+        # Track whether the user asked for debug output so hot paths can skip
+        # formatting bulky records (e.g. captured CLI logs) entirely.
+        self.debug_log_enabled = ch.level <= logging.DEBUG
 
         # Format logs the same as bitcoind's debug.log with microprecision (so log files can be concatenated and sorted)
         formatter = logging.Formatter(
@@ -269,18 +291,58 @@ class TestFramework:
         self.log.addHandler(ch)
 
     def _check_cli_binary(self):
-        assert os.path.exists(self.cli_binary), (
+        assert __path_exists_cached__(self.cli_binary), (
             "zgs CLI binary not found: %s" % self.cli_binary
         )
 
-    def _upload_file_use_cli(
+    def _run_cli_capture(self, args, timeout=60):
+        """Run a CLI command and capture combined stdout/stderr in memory.
+
+        Returns a (return_code, output_bytes) tuple.
+        """
+        proc = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=-1,
+            close_fds=False,
+        )
+        data, _ = proc.communicate(timeout=timeout)
+
+        return proc.returncode, data
+
+    def _run_cli(self, args, action, timeout=60):
+        """Run a CLI command, assert it succeeded and return its output."""
+        self.log.info("%s with cli: %s", action, args)
+
+        # the CLI forces colorful logs even when output is not a tty, so
+        # disable them at the source instead of stripping escapes afterwards
+        args = args + ["--log-color-disabled"]
+
+        try:
+            return_code, data = self._run_cli_capture(args, timeout=timeout)
+        except Exception as ex:
+            self.log.error("Failed to %s via CLI tool", action)
+            raise ex
+
+        # decode the buffer at most once, and only when the user asked for
+        # debug output; parsing below works on the raw bytes
+        if self.debug_log_enabled:
+            self.log.debug("cli output: %s", data.decode("utf-8", errors="replace"))
+
+        assert return_code == 0, "%s %s failed, log: %s" % (self.cli_binary, action, data)
+
+        return data
+
+    def _build_upload_args(
         self,
         blockchain_node_rpc_url,
         key,
         node_rpc_url,
         indexer_url,
         file_to_upload,
-        skip_tx = True,
+        skip_tx,
+        log_level,
     ):
         upload_args = [
             self.cli_binary,
@@ -291,7 +353,7 @@ class TestFramework:
             encode_hex(key),
             "--skip-tx="+str(skip_tx),
             "--log-level",
-            "debug",
+            log_level,
             "--gas-limit",
             "10000000",
         ]
@@ -302,41 +364,85 @@ class TestFramework:
             upload_args.append("--indexer")
             upload_args.append(indexer_url)
         upload_args.append("--file")
-        self.log.info("upload file with cli: {}".format(upload_args))
+        upload_args.append(file_to_upload.name)
+        return upload_args
 
-        output = tempfile.NamedTemporaryFile(dir=self.root_dir, delete=False, prefix="zgs_client_output_")
-        output_name = output.name
-        output_fileno = output.fileno()
+    def _parse_upload_root(self, data):
+        match = __upload_root_re__.search(data)
+        assert match is not None, "%s upload file missed root in log: %s" % (self.cli_binary, data)
+        return match.group(1).decode("utf-8")
 
-        try:
-            proc = subprocess.Popen(
-                upload_args + [file_to_upload.name],
-                text=True,
-                stdout=output_fileno,
-                stderr=output_fileno,
-            )
-            
-            return_code = proc.wait(timeout=60)
-
-            output.seek(0)
-            lines = output.readlines()
-            for line in lines:
-                line = line.decode("utf-8")
-                self.log.debug("line: %s", line)
-                if "root" in line:
-                    filtered_line = re.sub(r'\x1b\[([0-9,A-Z]{1,2}(;[0-9]{1,2})?(;[0-9]{3})?)?[m|K]?', '', line)
-                    index = filtered_line.find("root=")
-                    if index > 0:
-                        root = filtered_line[index + 5 : index + 5 + 66]
-        except Exception as ex:
-            self.log.error("Failed to upload file via CLI tool, output: %s", output_name)
-            raise ex
-        finally:
-            output.close()
+    def _upload_file_use_cli(
+        self,
+        blockchain_node_rpc_url,
+        key,
+        node_rpc_url,
+        indexer_url,
+        file_to_upload,
+        skip_tx = True,
+        log_level = "info",
+    ):
+        upload_args = self._build_upload_args(
+            blockchain_node_rpc_url,
+            key,
+            node_rpc_url,
+            indexer_url,
+            file_to_upload,
+            skip_tx,
+            log_level,
+        )
+
+        data = self._run_cli(upload_args, "upload file")
+
+        return self._parse_upload_root(data)
+
+    async def _upload_file_async(self, upload_args):
+        proc = await asyncio.create_subprocess_exec(
+            upload_args[0],
+            *upload_args[1:],
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        data, _ = await asyncio.wait_for(proc.communicate(), timeout=60)
+
+        assert proc.returncode == 0, "%s upload file failed, log: %s" % (self.cli_binary, data)
 
-        assert return_code == 0, "%s upload file failed, output: %s, log: %s" % (self.cli_binary, output_name, lines)
+        return self._parse_upload_root(data)
 
-        return root
+    def _upload_files_use_cli(
+        self,
+        blockchain_node_rpc_url,
+        key,
+        node_rpc_url,
+        indexer_url,
+        files_to_upload,
+        skip_tx = True,
+        log_level = "info",
+    ):
+        """Upload multiple files concurrently through the CLI.
+
+        Returns the merkle roots in the same order as files_to_upload.
+        """
+        args_list = [
+            self._build_upload_args(
+                blockchain_node_rpc_url,
+                key,
+                node_rpc_url,
+                indexer_url,
+                file_to_upload,
+                skip_tx,
+                log_level,
+            ) + ["--log-color-disabled"]
+            for file_to_upload in files_to_upload
+        ]
+        self.log.info("upload %d files concurrently with cli", len(args_list))
+
+        async def upload_all():
+            return await asyncio.gather(
+                *[self._upload_file_async(upload_args) for upload_args in args_list]
+            )
+
+        return asyncio.run(upload_all())
     
     def _download_file_use_cli(
         self,
@@ -344,6 +450,7 @@ class TestFramework:
         indexer_url,
         root,
         with_proof = True,
+        log_level = "info",
     ):
         file_to_download = os.path.join(self.root_dir, "download_{}_{}".format(root, time.time()))
         download_args = [
@@ -355,7 +462,7 @@ class TestFramework:
             root,
             "--proof=" + str(with_proof),
             "--log-level",
-            "debug",
+            log_level,
         ]
         if node_rpc_url is not None:
             download_args.append("--node")
@@ -363,30 +470,8 @@ class TestFramework:
         elif indexer_url is not None:
             download_args.append("--indexer")
             download_args.append(indexer_url)
-        self.log.info("download file with cli: {}".format(download_args))
-
-        output = tempfile.NamedTemporaryFile(dir=self.root_dir, delete=False, prefix="zgs_client_output_")
-        output_name = output.name
-        output_fileno = output.fileno()
-
-        try:
-            proc = subprocess.Popen(
-                download_args,
-                text=True,
-                stdout=output_fileno,
-                stderr=output_fileno,
-            )
-            
-            return_code = proc.wait(timeout=60)
-            output.seek(0)
-            lines = output.readlines()
-        except Exception as ex:
-            self.log.error("Failed to download file via CLI tool, output: %s", output_name)
-            raise ex
-        finally:
-            output.close()
 
-        assert return_code == 0, "%s download file failed, output: %s, log: %s" % (self.cli_binary, output_name, lines)
+        self._run_cli(download_args, "download file")
 
         os.remove(file_to_download)
 
@@ -402,6 +487,7 @@ class TestFramework:
         kv_keys,
         kv_values,
         skip_tx = True,
+        log_level = "info",
     ):
         kv_write_args = [
             self.cli_binary,
@@ -418,7 +504,7 @@ class TestFramework:
             "--stream-values",
             kv_values,
             "--log-level",
-            "debug",
+            log_level,
             "--gas-limit",
             "10000000",
         ]
@@ -428,31 +514,8 @@ class TestFramework:
         elif indexer_url is not None:
             kv_write_args.append("--indexer")
             kv_write_args.append(indexer_url)
-        self.log.info("kv write with cli: {}".format(kv_write_args))
-
-        output = tempfile.NamedTemporaryFile(dir=self.root_dir, delete=False, prefix="zgs_client_output_")
-        output_name = output.name
-        output_fileno = output.fileno()
-
-        try:
-            proc = subprocess.Popen(
-                kv_write_args,
-                text=True,
-                stdout=output_fileno,
-                stderr=output_fileno,
-            )
-            
-            return_code = proc.wait(timeout=60)
-
-            output.seek(0)
-            lines = output.readlines()
-        except Exception as ex:
-            self.log.error("Failed to write kv via CLI tool, output: %s", output_name)
-            raise ex
-        finally:
-            output.close()
 
-        assert return_code == 0, "%s write kv failed, output: %s, log: %s" % (self.cli_binary, output_name, lines)
+        self._run_cli(kv_write_args, "kv write")
 
         return
 
@@ -460,8 +523,15 @@ class TestFramework:
         self,
         node_rpc_url,
         stream_id,
-        kv_keys
+        kv_keys,
+        log_level = "info",
     ):
+        # The CLI has no persistent or batch mode, but --stream-keys takes a
+        # comma-separated list, so reading any number of keys costs a single
+        # process launch. Accept a key list and join it once, so callers
+        # never fall back to one CLI invocation per key.
+        if not isinstance(kv_keys, str):
+            kv_keys = ",".join(kv_keys)
         kv_read_args = [
             self.cli_binary,
             "kv-read",
@@ -472,41 +542,27 @@ class TestFramework:
             "--stream-keys",
             kv_keys,
             "--log-level",
-            "debug",
+            log_level,
         ]
-        self.log.info("kv read with cli: {}".format(kv_read_args))
+        data = self._run_cli(kv_read_args, "kv read")
 
-        output = tempfile.NamedTemporaryFile(dir=self.root_dir, delete=False, prefix="zgs_client_output_")
-        output_name = output.name
-        output_fileno = output.fileno()
-
-        try:
-            proc = subprocess.Popen(
-                kv_read_args,
-                text=True,
-                stdout=output_fileno,
-                stderr=output_fileno,
-            )
-            
-            return_code = proc.wait(timeout=60)
-            output.seek(0)
-            lines = output.readlines()
-        except Exception as ex:
-            self.log.error("Failed to read kv via CLI tool, output: %s", output_name)
-            raise ex
-        finally:
-            output.close()
-
-        assert return_code == 0, "%s read kv failed, output: %s, log: %s" % (self.cli_binary, output_name, lines)
-
-        return json.loads(lines[0].decode("utf-8").strip())
+        # only the JSON result on the first line is needed, so split once
+        # instead of materializing a line list for the whole buffer
+        return json.loads(data.split(b"\n", 1)[0].decode("utf-8").strip())
 
     def setup_params(self):
         self.num_blockchain_nodes = 1
         self.num_nodes = 1
 
     def setup_nodes(self):
+        # the zgs_node build is independent of blockchain genesis and
+        # bring-up, so let it run while the chain produces its first block
+        build_thread = threading.Thread(
+            target=build_zgs, args=(Path(self.zgs_binary).parent.absolute(),)
+        )
+        build_thread.start()
         self.__setup_blockchain_node()
+        build_thread.join()
         self.__setup_zgs_node()
 
     def setup_kv_node(self, index, stream_ids, updated_config={}):
@@ -529,15 +585,17 @@ class TestFramework:
         node.wait_for_rpc_connection()
     
     def setup_indexer(self, trusted, discover_node, discover_ports = None):
+        port = indexer_port(0)
         indexer_args = [
             self.cli_binary,
             "indexer",
             "--endpoint",
-            ":{}".format(indexer_port(0)),
+            ":{}".format(port),
             "--trusted",
             trusted,
             "--log-level",
             "debug",
+            "--log-color-disabled",
         ]
         if discover_ports is not None:
             indexer_args.append("--discover-ports")
@@ -548,37 +606,51 @@ class TestFramework:
         self.log.info("start indexer with args: {}".format(indexer_args))
         data_dir = os.path.join(self.root_dir, "indexer0")
         os.mkdir(data_dir)
-        stdout = tempfile.NamedTemporaryFile(
-            dir=data_dir, prefix="stdout", delete=False
-        )
-        stderr = tempfile.NamedTemporaryFile(
-            dir=data_dir, prefix="stderr", delete=False
-        )
+        if self.debug_log_enabled:
+            stdout = tempfile.NamedTemporaryFile(
+                dir=data_dir, prefix="stdout", delete=False
+            )
+            stderr = tempfile.NamedTemporaryFile(
+                dir=data_dir, prefix="stderr", delete=False
+            )
+        else:
+            # at debug verbosity the indexer log grows unbounded for the
+            # lifetime of the test and is only ever read when debugging
+            stdout = subprocess.DEVNULL
+            stderr = subprocess.DEVNULL
         self.indexer_process = subprocess.Popen(
             indexer_args,
             stdout=stdout,
             stderr=stderr,
             cwd=data_dir,
             env=os.environ.copy(),
+            close_fds=False,
         )
-        self.indexer_rpc_url = "http://127.0.0.1:{}".format(indexer_port(0))
+        self.indexer_rpc_url = "http://127.0.0.1:{}".format(port)
     
     def stop_indexer(self):
         if self.indexer_process is not None:
             self.indexer_process.terminate()
-            wait_until(lambda: self.indexer_process.poll() is not None, timeout=20)
+            try:
+                # block on the OS child wait instead of polling poll()
+                self.indexer_process.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                self.indexer_process.kill()
+                self.indexer_process.wait()
 
     def stop_nodes(self):
-        # stop storage nodes first
-        for node in self.nodes:
-            node.stop()
-
-        for node in self.blockchain_nodes:
-            node.stop()
+        def stop_all(nodes):
+            if nodes:
+                with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+                    list(executor.map(lambda node: node.stop(), nodes))
+
+        # stop storage nodes first so they do not log errors against an
+        # already-stopped blockchain node; nodes within a group are
+        # independent and stop concurrently
+        stop_all(self.nodes)
+        stop_all(self.blockchain_nodes)
+        stop_all(self.kv_nodes)
 
-        for node in self.kv_nodes:
-            node.stop()
-        
         self.stop_indexer()
 
     def stop_kv_node(self, index):
@@ -632,16 +704,16 @@ class TestFramework:
             self.log.info("Symlink: %s", Path(dst).absolute())
 
         if self.blockchain_node_type == BlockChainNodeType.ZG:
-            self.blockchain_binary = os.path.abspath(self.options.zg)
+            self.blockchain_binary = __abspath_cached__(self.options.zg)
         else:
             raise NotImplementedError
 
-        self.zgs_binary = os.path.abspath(self.options.zerog_storage)
-        self.cli_binary = os.path.abspath(self.options.cli)
-        self.contract_path = os.path.abspath(self.options.contract)
-        self.kv_binary = os.path.abspath(self.options.zgs_kv)
+        self.zgs_binary = __abspath_cached__(self.options.zerog_storage)
+        self.cli_binary = __abspath_cached__(self.options.cli)
+        self.contract_path = __abspath_cached__(self.options.contract)
+        self.kv_binary = __abspath_cached__(self.options.zgs_kv)
 
-        assert os.path.exists(self.contract_path), (
+        assert __path_exists_cached__(self.contract_path), (
             "%s should be exist" % self.contract_path
         )
 
@@ -686,6 +758,15 @@ class TestFramework:
         logging.shutdown()
 
         if success == TestStatus.PASSED:
-            shutil.rmtree(self.root_dir)
+            # rename first so the path is released immediately, then let a
+            # background thread walk and unlink the tree; the (non-daemon)
+            # thread keeps running while the test result is reported
+            trash_dir = "{}.trash.{}".format(self.root_dir, os.getpid())
+            os.rename(self.root_dir, trash_dir)
+            threading.Thread(
+                target=shutil.rmtree,
+                args=(trash_dir,),
+                kwargs={"ignore_errors": True},
+            ).start()
 
         sys.exit(exit_code)